@@ -2,22 +2,39 @@ from __future__ import annotations
 
 """FastAPI application entry-point for the recipe chatbot."""
 
+import threading
+from contextlib import asynccontextmanager
+from itertools import chain
 from pathlib import Path
-from typing import Final, List, Dict
+from typing import AsyncIterator, Final, List, Dict
 
 from fastapi import FastAPI, HTTPException, status
-from fastapi.responses import HTMLResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 
-from backend.utils import get_agent_response  # noqa: WPS433 import from parent
+from backend.utils import (  # noqa: WPS433 import from parent
+    get_agent_response,
+    get_agent_response_stream,
+    warm_up_model,
+)
 
 # -----------------------------------------------------------------------------
 # Application setup
 # -----------------------------------------------------------------------------
 
 APP_TITLE: Final[str] = "Recipe Chatbot"
-app = FastAPI(title=APP_TITLE)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Warm up the model connection in the background so startup isn't delayed."""
+    threading.Thread(target=warm_up_model, daemon=True).start()
+    yield
+
+
+app = FastAPI(title=APP_TITLE, lifespan=lifespan)
 
 # Serve static assets (currently just the HTML) under `/static/*`.
 STATIC_DIR = Path(__file__).parent.parent / "frontend"
@@ -73,6 +90,28 @@ async def chat_endpoint(payload: ChatRequest) -> ChatResponse:  # noqa: WPS430
     return ChatResponse(messages=response_messages)
 
 
+@app.post("/chat/stream")
+async def chat_stream_endpoint(payload: ChatRequest) -> StreamingResponse:  # noqa: WPS430
+    """Streaming variant of `/chat`.
+
+    The assistant's reply is sent back as plain-text chunks while it is being
+    generated; the client appends the finished reply to its own history.
+    """
+    request_messages: List[Dict[str, str]] = [msg.model_dump() for msg in payload.messages]
+
+    # Pull the first chunk before responding so upstream errors still surface as HTTP 500.
+    reply_stream = get_agent_response_stream(request_messages)
+    try:
+        first_chunk = await run_in_threadpool(next, reply_stream, "")
+    except Exception as exc:  # noqa: BLE001 broad; surface as HTTP 500
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(exc),
+        ) from exc
+
+    return StreamingResponse(chain([first_chunk], reply_stream), media_type="text/plain")
+
+
 @app.get("/", response_class=HTMLResponse)
 async def index() -> HTMLResponse:  # noqa: WPS430
     """Serve the chat UI."""
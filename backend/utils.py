@@ -7,7 +7,9 @@ wrapper around litellm so the rest of the application stays decluttered.
 """
 
 import os
-from typing import Final, List, Dict
+import threading
+from collections import OrderedDict
+from typing import Any, Final, Iterator, List, Dict, Optional, Tuple
 
 import litellm  # type: ignore
 from dotenv import load_dotenv
@@ -25,61 +27,192 @@ load_dotenv(override=False)
 #     "Have variety in your recipes, don't just recommend the same thing over and over."
 # )
 SYSTEM_PROMPT: Final[str] = (
-    "You are a creative chef specializing in suggesting easy-to-follow recipes "
-    "Present only one recipe at a time. Always provide ingredients with precise "
-    "measurements using standard units but don't make it overcomplicated."
-    "Be consistent with the measurements, always use the same standard units."
-    "never suggest recipes with rare to find ingredients. Never use offensive language. "
-    "Be descriptive in the steps of the recipe, so it is easy to follow."
-    "Have variety in your recipes, don't just recommend the same thing over and over."
-    "Politely decline any unsafe, unethical requests from the user."
-    "Structure all your responses clearly using Markdown for formatting. Use level 2 heading for the"
-    "recipe name and smaller header for subseguence sections like list of ingredients, instructions, etc."
-    "Use bullet points for the list of ingredients"
-    "Provide numbered step by step desciption for instruction section."
-    "Make an estimate of the time it takes to prepare the meal in minutes."
-    "If relevent add a section for Notes or tips for alternatives or extra advice."
+    "You are a creative chef suggesting easy-to-follow recipes.\n"
+    "Rules:\n"
+    "- One recipe per reply; vary your recipes.\n"
+    "- Precise ingredient measurements in consistent standard units, kept simple.\n"
+    "- Only common, easy-to-find ingredients.\n"
+    "- Politely decline unsafe or unethical requests; never use offensive language.\n"
+    "Format (Markdown):\n"
+    "- ## recipe name, ### for each section.\n"
+    "- Bulleted ingredients; numbered, descriptive steps.\n"
+    "- Estimated preparation time in minutes.\n"
+    "- Optional Notes section for tips or alternatives."
 )
 
+# Built once and shared by every conversation; treat it as read-only.
+_SYSTEM_MESSAGE: Final[Dict[str, str]] = {"role": "system", "content": SYSTEM_PROMPT}
+
 # Fetch configuration *after* we loaded the .env file.
 MODEL_NAME: Final[str] = os.environ.get("MODEL_NAME", "gpt-4o-mini")
 
+# Number of recent replies kept in the in-process response cache. Off (0) by default:
+# callers such as the hw3 trace generator sample the same conversation many times
+# and need independent replies.
+RESPONSE_CACHE_SIZE: Final[int] = int(os.environ.get("RESPONSE_CACHE_SIZE", "0"))
+
+
+def _is_anthropic_model(model: str) -> bool:
+    """Return True if *model* is routed to Anthropic; unknown models count as not."""
+
+    try:
+        return litellm.get_llm_provider(model)[1] == "anthropic"
+    except Exception:  # noqa: BLE001 litellm raises for models it can't route
+        return False
+
+
+# Anthropic only caches prompt prefixes that are explicitly marked; OpenAI caches
+# identical prefixes automatically, so the system prompt always goes first.
+_USE_CACHE_CONTROL: Final[bool] = _is_anthropic_model(MODEL_NAME)
+
+
+# --- Response cache --------------------------------------------------------------
+
+# Identical conversations (system prompt included) get the same reply without an API
+# round trip. The cache is shared by the request threads, hence the lock.
+_CacheKey = Tuple[Tuple[str, str], ...]
+_response_cache: "OrderedDict[_CacheKey, str]" = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+
+def _cache_key(messages: List[Dict[str, str]]) -> _CacheKey:
+    """Build a hashable key from the roles and contents of *messages*."""
+    return tuple((msg["role"], msg["content"]) for msg in messages)
+
+
+def _get_cached_reply(key: _CacheKey) -> Optional[str]:
+    """Return the cached reply for *key*, marking it as recently used."""
+    with _response_cache_lock:
+        reply = _response_cache.get(key)
+        if reply is not None:
+            _response_cache.move_to_end(key)
+        return reply
+
+
+def _cache_reply(key: _CacheKey, reply: str) -> None:
+    """Store *reply*, evicting the least recently used entries beyond the limit."""
+    if RESPONSE_CACHE_SIZE <= 0:
+        return
+    with _response_cache_lock:
+        _response_cache[key] = reply
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+
 
 # --- Agent wrapper ---------------------------------------------------------------
 
-def get_agent_response(messages: List[Dict[str, str]]) -> List[Dict[str, str]]:  # noqa: WPS231
-    """Call the underlying large-language model via *litellm*.
+def _with_system_prompt(messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Ensure the system prompt is the first item of *messages*, in place."""
+
+    # The first message is assumed to be the system prompt if not explicitly provided
+    # or if the history is empty. We'll ensure the system prompt is always first.
+    # The list is updated in place rather than copied on every turn.
+    if not messages or messages[0]["role"] != "system":
+        messages.insert(0, _SYSTEM_MESSAGE)
+    return messages
+
+
+def _to_request_messages(current_messages: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """Mark the system prompt as cacheable for providers that need it explicitly."""
+
+    if not _USE_CACHE_CONTROL:
+        return current_messages
+
+    cached_system = {
+        "role": "system",
+        "content": [
+            {
+                "type": "text",
+                "text": current_messages[0]["content"],
+                "cache_control": {"type": "ephemeral"},
+            }
+        ],
+    }
+    return [cached_system] + current_messages[1:]
+
+
+def get_agent_response_stream(messages: List[Dict[str, str]]) -> Iterator[str]:
+    """Stream the assistant's reply from the underlying model via *litellm*.
 
     Parameters
     ----------
     messages:
         The full conversation history. Each item is a dict with "role" and "content".
+        The system prompt is inserted in place if it is missing.
 
-    Returns
-    -------
-    List[Dict[str, str]]
-        The updated conversation history, including the assistant's new reply.
+    Yields
+    ------
+    str
+        Chunks of the assistant's reply, in order, as the model generates them.
     """
 
     # litellm is model-agnostic; we only need to supply the model name and key.
-    # The first message is assumed to be the system prompt if not explicitly provided
-    # or if the history is empty. We'll ensure the system prompt is always first.
-    current_messages: List[Dict[str, str]]
-    if not messages or messages[0]["role"] != "system":
-        current_messages = [{"role": "system", "content": SYSTEM_PROMPT}] + messages
-    else:
-        current_messages = messages
+    current_messages = _with_system_prompt(messages)
 
-    completion = litellm.completion(
+    cache_key = _cache_key(current_messages)
+    cached_reply = _get_cached_reply(cache_key)
+    if cached_reply is not None:
+        yield cached_reply
+        return
+
+    stream = litellm.completion(
         model=MODEL_NAME,
-        messages=current_messages, # Pass the full history
+        messages=_to_request_messages(current_messages), # Pass the full history
+        stream=True,
     )
 
-    assistant_reply_content: str = (
-        completion["choices"][0]["message"]["content"]  # type: ignore[index]
-        .strip()
-    )
-    
+    reply_parts: List[str] = []
+    for chunk in stream:
+        content = chunk.choices[0].delta.content
+        if content:
+            reply_parts.append(content)
+            yield content
+
+    # Only replies that streamed to completion are cached.
+    _cache_reply(cache_key, "".join(reply_parts))
+
+
+def get_agent_response(messages: List[Dict[str, str]]) -> List[Dict[str, str]]:  # noqa: WPS231
+    """Call the underlying large-language model and wait for the complete reply.
+
+    This is a thin wrapper around :func:`get_agent_response_stream` for callers
+    that only need the final conversation, such as the bulk test script.
+
+    Parameters
+    ----------
+    messages:
+        The full conversation history. Each item is a dict with "role" and "content".
+        The list is updated in place, so pass a copy if the original must be kept.
+
+    Returns
+    -------
+    List[Dict[str, str]]
+        The same list, now starting with the system prompt and ending with the
+        assistant's new reply.
+    """
+
+    _with_system_prompt(messages)
+    assistant_reply_content = "".join(get_agent_response_stream(messages)).strip()
+
     # Append assistant's response to the history
-    updated_messages = current_messages + [{"role": "assistant", "content": assistant_reply_content}]
-    return updated_messages 
\ No newline at end of file
+    messages.append({"role": "assistant", "content": assistant_reply_content})
+    return messages
+
+
+def warm_up_model() -> None:
+    """Send a one-token request so the first real chat turn skips the cold start.
+
+    The first *litellm* call in a process pays for lazy imports, DNS lookup and the
+    TLS handshake; litellm keeps the provider client afterwards, so later calls reuse
+    the open connection. Failures are ignored: the chat still works, just cold.
+    """
+
+    try:
+        litellm.completion(
+            model=MODEL_NAME,
+            messages=[{"role": "user", "content": "ping"}],
+            max_tokens=1,
+        )
+    except Exception:  # noqa: BLE001 best effort only
+        pass
@@ -1,10 +1,20 @@
-import yaml
 import os
+import tomllib
+import asyncio
+import argparse
 import csv
 import json
+import orjson
+import random
+import time
+import httpx
+import litellm
+from contextlib import nullcontext
+from functools import lru_cache
 from dotenv import load_dotenv
-from litellm import completion
-from typing import List, Dict, Any
+from litellm import acompletion, get_llm_provider
+from openai import OpenAI
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -12,6 +22,16 @@ from datetime import datetime
 # Load environment variables
 load_dotenv()
 
+# Share pooled HTTP/2 connections across calls so retries and concurrent requests reuse
+# TCP/TLS sessions (and multiplex over them) instead of reconnecting each time
+HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+HTTP_TIMEOUT_SECONDS = 60.0
+litellm.client_session = httpx.Client(http2=True, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT_SECONDS)
+litellm.aclient_session = httpx.AsyncClient(http2=True, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT_SECONDS)
+
+# Silently drop params a provider doesn't support (e.g. response_format) instead of failing the call
+litellm.drop_params = True
+
 MODEL_NAME = 'gpt-4o-mini'
 
 # use pydantic models for structured output
@@ -27,46 +47,146 @@ class SyntheticQuery(BaseModel):
     query: str
     tuple_reference: str
 
-class SyntheticQueriesList(BaseModel):
+# keys are explicit fields rather than dict keys: OpenAI strict structured output
+# rejects object schemas with open-ended additionalProperties
+class KeyedQueryGroup(BaseModel):
+    key: str
     queries: List[SyntheticQuery]
 
+class KeyedQueries(BaseModel):
+    results: List[KeyedQueryGroup]
+
 NUM_TUPLES_TO_GENERATE = 15
 NNUM_QUERIES_PER_TUPLE = 7
+TUPLES_PER_REQUEST = 5  # tuples packed into a single query-generation call
+MAX_CONCURRENT_REQUESTS = 8  # keep parallel calls under the provider's RPM limits
+BATCH_POLL_INTERVAL_SECONDS = 30
+MAX_RETRIES = 6
+RETRY_MAX_WAIT_SECONDS = 30
+# transient errors worth retrying; anything else (bad request, auth, bad JSON) fails immediately
+RETRYABLE_ERRORS = (
+    litellm.RateLimitError,
+    litellm.APIConnectionError,
+    litellm.InternalServerError,
+    litellm.ServiceUnavailableError,
+    litellm.Timeout,
+)
+
+# static part of the query prompt, identical for every tuple so providers can cache it as a prefix
+STATIC_QUERY_INSTRUCTIONS = f"""
+You are a recipe chatbot prompt generator. Create {NNUM_QUERIES_PER_TUPLE} dirverse, realistic user queries for each recipe dimension tuple given at the end.
+The tuples are given as a JSON object keyed by number; return one result group per key.
+
+Generate queries that include:
+1. Different user personas (busy parent, college student, food enthusiast, beginner cook)
+2. Realistic scenarios (dinner party, quick lunch, weekend cooking, meal prep)
+3. Specific constraints (dietary restrictions, time limits, available ingredients)
+4. Natural language variations (casual, formal, urgent, exploratory)
+5. Contextual details (cooking for family, trying new cuisine, comfort food, healthy options)
+
+Example personas and scenarios:
+- "I'm a college student with 30 minutes - need a simple [cuisine] [meal] that won't break the bank"
+- "Planning a dinner party and want to impress guests with [difficulty] [cuisine] [meal] - any suggestions?"
+- "New to cooking [cuisine] food - looking for [difficulty] [meal] recipes with clear instructions"
+- "Busy parent needs [difficulty] [cuisine] [meal] that kids will actually eat"
+
+Create varied, natural queries that sound like real people asking for recipe help.
+
+Provide your response as JSON:
+
+{{
+    "results": [
+        {{
+            "key": "1",
+            "queries": [
+                {{
+                    "query": "natural language query text",
+                    "tuple_reference": "cuisine_type: meal_type: difficulty"
+                }}
+            ]
+        }},
+        {{
+            "key": "2",
+            "queries": [...]
+        }}
+    ]
+}}
+"""
+
+# per-request tail of the query prompt, filled in with str.format for each chunk of tuples
+QUERY_TUPLES_TEMPLATE = """
+{query_prompt}
 
-#  load prompts from yaml
-def load_prompts(yaml_file: str) -> List[Dict[str, str]]:
-    """Load prompts from YAML file."""
-    with open(yaml_file, 'r') as file:
-        data = yaml.safe_load(file)
-    return data
+Recipe dimension tuples:
+{tuples}
+"""
 
-def get_prompt_by_subject(prompts_data: List[Dict], subject: str) -> str:
+#  load prompts from toml
+@lru_cache(maxsize=1)
+def load_prompts(toml_file: str) -> Dict[str, str]:
+    """Load prompts from TOML file, keyed by subject. Parsed once per file."""
+    with open(toml_file, 'rb') as file:
+        data = tomllib.load(file)
+    return {prompt['subject']: prompt['message'] for prompt in data['prompts']}
+
+def get_prompt_by_subject(prompts_data: Dict[str, str], subject: str) -> str:
     """Find a specific prompt by its subject."""
-    for prompt in prompts_data:
-        if prompt['subject'] == subject:
-            return prompt['message']
-    raise ValueError(f"Prompt with subject '{subject}' not found")
+    if subject not in prompts_data:
+        raise ValueError(f"Prompt with subject '{subject}' not found")
+    return prompts_data[subject]
 
 #  call llm 
-def call_llm(messages: List[Dict[str, str]], response_format: Any) -> Any:
-    """Call LLM with structured output format."""
-    try:
-        response = completion(
-            model=MODEL_NAME,
-            messages=messages,
-            response_format=response_format
-        )
-        
-        # Parse the JSON response and return the Pydantic model
-        response_content = response.choices[0].message.content
-        return response_format(**json.loads(response_content))
-        
-    except Exception as e:
-        print(f"Error calling LLM: {e}")
-        raise
+def retry_wait_seconds(attempt: int) -> float:
+    """Exponential backoff with jitter: ~1s, 2s, 4s, ... capped at RETRY_MAX_WAIT_SECONDS."""
+    return min(2 ** attempt, RETRY_MAX_WAIT_SECONDS) + random.uniform(0, 1)
+
+def response_json(response: Any) -> Any:
+    """Get the structured output of a completion.
+
+    Uses the pre-parsed `parsed` field when the provider/SDK fills it in (a Pydantic
+    model or dict), otherwise parses the JSON text content with orjson.
+    """
+    message = response.choices[0].message
+    parsed = getattr(message, "parsed", None)
+    if parsed is not None:
+        return parsed
+    if not message.content:
+        raise ValueError("LLM returned an empty response")
+    return orjson.loads(message.content)
+
+async def acall_llm_raw(messages: List[Dict[str, str]], response_format: Any, semaphore: Optional[asyncio.Semaphore] = None) -> Dict[str, Any]:
+    """Call LLM with structured output format, retrying transient API errors.
+
+    Concurrency is bounded by the optional semaphore. Returns the parsed JSON as
+    plain dicts; response_format is only used as the schema hint for the LLM, no
+    Pydantic models are built for the response.
+    """
+    for attempt in range(MAX_RETRIES):
+        try:
+            async with semaphore or nullcontext():
+                response = await acompletion(
+                    model=MODEL_NAME,
+                    messages=messages,
+                    response_format=response_format
+                )
+
+            result = response_json(response)
+            return result.model_dump() if isinstance(result, BaseModel) else result
+
+        except RETRYABLE_ERRORS as e:
+            if attempt == MAX_RETRIES - 1:
+                print(f"Error calling LLM after {MAX_RETRIES} attempts: {e}")
+                raise
+            # back off outside the semaphore so other requests can use the slot
+            wait = retry_wait_seconds(attempt)
+            print(f"Transient LLM error ({type(e).__name__}), retrying in {wait:.1f}s...")
+            await asyncio.sleep(wait)
+        except Exception as e:
+            print(f"Error calling LLM: {e}")
+            raise
 
 #  generate recipe dimension tuples
-def generate_recipe_tuples(tuple_prompt: str) -> RecipeDimensionsList:
+async def generate_recipe_tuples(tuple_prompt: str) -> RecipeDimensionsList:
     """Generate recipe dimension tuples using the tuple prompt."""
     
     # Enhance the prompt to ensure structured output
@@ -92,74 +212,220 @@ def generate_recipe_tuples(tuple_prompt: str) -> RecipeDimensionsList:
     
     messages = [{"role": "user", "content": enhanced_prompt}]
     
-    result = call_llm(messages, RecipeDimensionsList)
+    result = RecipeDimensionsList.model_validate(await acall_llm_raw(messages, RecipeDimensionsList))
     print(f"Generated {len(result.tuples)} recipe dimension tuples")
     return result
 
+def is_anthropic_model() -> bool:
+    """Check whether MODEL_NAME is served by Anthropic, which needs explicit cache_control markers."""
+    try:
+        return get_llm_provider(MODEL_NAME)[1] == "anthropic"
+    except Exception:
+        # litellm raises for model names it can't route; treat them as non-Anthropic
+        return False
+
+def chunk_tuples(tuples: List[RecipeDimensionTuple], size: int) -> List[List[RecipeDimensionTuple]]:
+    """Split tuples into consecutive chunks of at most `size` items."""
+    return [tuples[i:i + size] for i in range(0, len(tuples), size)]
+
+# build the keyed query prompt for a chunk of tuples
+def build_query_messages(query_prompt: str, tuple_items: List[RecipeDimensionTuple]) -> List[Dict[str, Any]]:
+    """Build the chat messages asking for synthetic queries for a chunk of tuples.
+
+    The static instructions always come first so they form a cacheable prefix
+    (automatic for OpenAI, marked with cache_control for Anthropic); only the
+    short tail with the tuple details changes between calls.
+    """
+    keyed_tuples = {
+        str(i): {
+            "cuisine": tuple_item.cuisine_type,
+            "meal": tuple_item.meal_type,
+            "difficulty": tuple_item.degree_of_simplicity,
+        }
+        for i, tuple_item in enumerate(tuple_items, 1)
+    }
+    dynamic_prompt = QUERY_TUPLES_TEMPLATE.format(
+        query_prompt=query_prompt,
+        tuples=json.dumps(keyed_tuples, indent=2),
+    )
+
+    if is_anthropic_model():
+        system_content = [{"type": "text", "text": STATIC_QUERY_INSTRUCTIONS, "cache_control": {"type": "ephemeral"}}]
+    else:
+        system_content = STATIC_QUERY_INSTRUCTIONS
+
+    return [
+        {"role": "system", "content": system_content},
+        {"role": "user", "content": dynamic_prompt},
+    ]
+
+def flatten_keyed_queries(keyed: Dict[str, Any], num_tuples: int) -> List[Dict[str, str]]:
+    """Flatten a raw KeyedQueries response in tuple order, failing if any tuple is missing or malformed."""
+    groups = keyed.get("results")
+    if not isinstance(groups, list) or not all(isinstance(group, dict) and "key" in group for group in groups):
+        raise ValueError("Response has no 'results' list of keyed groups")
+    results = {str(group["key"]): group.get("queries") for group in groups}
+
+    missing = [str(i) for i in range(1, num_tuples + 1) if str(i) not in results]
+    if missing:
+        raise ValueError(f"Response is missing queries for tuple keys {missing}")
+
+    queries = []
+    for i in range(1, num_tuples + 1):
+        tuple_queries = results[str(i)]
+        if not isinstance(tuple_queries, list) or not all(isinstance(q, dict) and "query" in q for q in tuple_queries):
+            raise ValueError(f"Malformed queries for tuple key '{i}'")
+        queries.extend(tuple_queries)
+    return queries
+
+async def generate_queries_for_chunk(query_prompt: str, tuple_items: List[RecipeDimensionTuple], semaphore: asyncio.Semaphore) -> List[Dict[str, str]]:
+    """Generate queries for a chunk of tuples, splitting the chunk in half if the response can't be parsed.
+
+    API errors (bad request, auth, exhausted retries) are not retried in smaller chunks and propagate as-is.
+    """
+    try:
+        result = await acall_llm_raw(build_query_messages(query_prompt, tuple_items), KeyedQueries, semaphore)
+        return flatten_keyed_queries(result, len(tuple_items))
+    except ValueError as e:
+        # malformed or incomplete JSON (orjson.JSONDecodeError is a ValueError too)
+        if len(tuple_items) == 1:
+            raise
+        half = len(tuple_items) // 2
+        print(f"Falling back to smaller chunks ({half} + {len(tuple_items) - half} tuples): {e}")
+        first, second = await asyncio.gather(
+            generate_queries_for_chunk(query_prompt, tuple_items[:half], semaphore),
+            generate_queries_for_chunk(query_prompt, tuple_items[half:], semaphore),
+        )
+        return first + second
+
 # generate synthetic queries 
-def generate_synthetic_queries(query_prompt: str, tuples_data: RecipeDimensionsList) -> SyntheticQueriesList:
-    """Generate synthetic queries based on the tuples"""
-    all_queries = []
-    # Format tuples for the prompt
-    for tuple_item in tuples_data.tuples:
-        enhanced_prompt=f"""
-        You are a recipe chatbot prompt generator. Create {NNUM_QUERIES_PER_TUPLE} dirverse, realistic user queries for this recipe dimension tuple:
-        - Cuisine: {tuple_item.cuisine_type}
-        - Meal: {tuple_item.meal_type}
-        - Difficulty: {tuple_item.degree_of_simplicity}
-
-        Generate queries that include:
-        1. Different user personas (busy parent, college student, food enthusiast, beginner cook)
-        2. Realistic scenarios (dinner party, quick lunch, weekend cooking, meal prep)
-        3. Specific constraints (dietary restrictions, time limits, available ingredients)
-        4. Natural language variations (casual, formal, urgent, exploratory)
-        5. Contextual details (cooking for family, trying new cuisine, comfort food, healthy options)
-
-        Example personas and scenarios:
-        - "I'm a college student with 30 minutes - need a simple [cuisine] [meal] that won't break the bank"
-        - "Planning a dinner party and want to impress guests with [difficulty] [cuisine] [meal] - any suggestions?"
-        - "New to cooking [cuisine] food - looking for [difficulty] [meal] recipes with clear instructions"
-        - "Busy parent needs [difficulty] [cuisine] [meal] that kids will actually eat"
-
-        {query_prompt}
-        
-        Create varied, natural queries that sound like real people asking for recipe help.
+async def generate_synthetic_queries(query_prompt: str, tuples_data: RecipeDimensionsList) -> List[Dict[str, str]]:
+    """Generate synthetic queries based on the tuples, one concurrent LLM call per chunk of tuples.
 
-        Provide your response as JSON:
-        
-        {{
-            "queries": [
-                {{
-                    "query": "natural language query text",
-                    "tuple_reference": "cuisine_type: meal_type: difficulty"
-                }}
-            ]
-        }}
-        """
+    Queries are returned as plain dicts (query, tuple_reference) ready to be written out.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    chunks = chunk_tuples(tuples_data.tuples, TUPLES_PER_REQUEST)
+    tasks = [generate_queries_for_chunk(query_prompt, chunk, semaphore) for chunk in chunks]
 
-        messages = [{"role": "user", "content": enhanced_prompt}]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
 
-        result = call_llm(messages, SyntheticQueriesList)
-        all_queries.extend(result.queries)
+    all_queries = []
+    failed_chunks = 0
+    for chunk, result in zip(chunks, results):
+        if isinstance(result, Exception):
+            print(f"Failed chunk of {len(chunk)} tuples starting with {chunk[0].cuisine_type} {chunk[0].meal_type}: {result}")
+            failed_chunks += 1
+            continue
+        all_queries.extend(result)
+
+    # don't let a partial run pass for a complete one
+    if failed_chunks:
+        raise RuntimeError(f"{failed_chunks} of {len(chunks)} query chunks failed")
     print(f"Generated {len(all_queries)} synthetic queries")
-    return SyntheticQueriesList(queries=all_queries)
+    return all_queries
+
+#  generate synthetic queries through the OpenAI Batch API
+def submit_batch(query_prompt: str, tuples_data: RecipeDimensionsList, filename: str = "batch_requests.jsonl") -> str:
+    """Write one chat completion request per chunk of tuples to a JSONL file and submit it as a batch job."""
+    chunks = chunk_tuples(tuples_data.tuples, TUPLES_PER_REQUEST)
+    with open(filename, 'w', encoding='utf-8') as f:
+        for i, chunk in enumerate(chunks):
+            request = {
+                "custom_id": f"chunk_{i}_{len(chunk)}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": MODEL_NAME,
+                    "messages": build_query_messages(query_prompt, chunk),
+                    "response_format": {"type": "json_object"},
+                },
+            }
+            f.write(json.dumps(request) + "\n")
+
+    client = OpenAI()
+    with open(filename, 'rb') as f:
+        batch_file = client.files.create(file=f, purpose="batch")
+
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    print(f"Submitted batch {batch.id} with {len(chunks)} requests for {len(tuples_data.tuples)} tuples")
+    return batch.id
+
+def collect_batch_results(batch_id: str) -> List[Dict[str, str]]:
+    """Poll the batch job until it finishes and parse its output into synthetic queries."""
+    client = OpenAI()
+    batch = client.batches.retrieve(batch_id)
+    while batch.status != "completed":
+        if batch.status in ("failed", "expired", "cancelled"):
+            raise RuntimeError(f"Batch {batch_id} ended with status '{batch.status}'")
+        print(f"Batch {batch_id} is {batch.status}, checking again in {BATCH_POLL_INTERVAL_SECONDS}s...")
+        time.sleep(BATCH_POLL_INTERVAL_SECONDS)
+        batch = client.batches.retrieve(batch_id)
+
+    # requests that failed outright are only listed in the error file; when every request
+    # fails the batch still reports 'completed' but has no output file at all
+    failed = []
+    if batch.error_file_id:
+        for line in client.files.content(batch.error_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            item = orjson.loads(line)
+            error = item.get("error") or (item.get("response") or {}).get("body")
+            print(f"Batch request {item.get('custom_id')} failed: {error}")
+            failed.append(item.get("custom_id"))
+
+    output = client.files.content(batch.output_file_id).text if batch.output_file_id else ""
+
+    # results are not guaranteed to come back in submission order
+    results = {}
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        item = orjson.loads(line)
+        if item.get("error") or item["response"]["status_code"] != 200:
+            print(f"Batch request {item['custom_id']} failed: {item.get('error') or item['response']['body']}")
+            failed.append(item["custom_id"])
+            continue
+        content = item["response"]["body"]["choices"][0]["message"]["content"]
+        num_tuples = int(item["custom_id"].split("_")[2])
+        try:
+            results[item["custom_id"]] = flatten_keyed_queries(orjson.loads(content), num_tuples)
+        except ValueError as e:
+            print(f"Batch request {item['custom_id']} returned unusable output: {e}")
+            failed.append(item["custom_id"])
+
+    # don't let a partial run pass for a complete one
+    if failed:
+        raise RuntimeError(f"{len(failed)} of {batch.request_counts.total} requests in batch {batch_id} failed")
+
+    all_queries = []
+    for custom_id in sorted(results, key=lambda k: int(k.split("_")[1])):
+        all_queries.extend(results[custom_id])
+    print(f"Generated {len(all_queries)} synthetic queries")
+    return all_queries
+
+def generate_synthetic_queries_batch(query_prompt: str, tuples_data: RecipeDimensionsList, filename: str = "batch_requests.jsonl") -> List[Dict[str, str]]:
+    """Submit the batch job and block until its queries are collected."""
+    batch_id = submit_batch(query_prompt, tuples_data, filename=filename)
+    return collect_batch_results(batch_id)
 
 # save outputs to the files
 def save_tuples_to_file(tuples_data: RecipeDimensionsList, filename: str = "recipe_dimensions.py"):
     """Save generated tuples to a Python file."""
 
-    python_code = '''"""
+    header = '''"""
 Recipe dimension tuples generated automatically.
 Each tuple contains (cuisine_type, meal_type, degree_of_simplicity)
 """
 
 recipe_dimensions = [
 '''
-    
-    for tuple_item in tuples_data.tuples:
-        python_code += f'    ("{tuple_item.cuisine_type}", "{tuple_item.meal_type}", "{tuple_item.degree_of_simplicity}"),\n'
-    
-    python_code += ''']
+
+    footer = ''']
 
 # Example usage:
 if __name__ == "__main__":
@@ -169,12 +435,21 @@ if __name__ == "__main__":
         print(f"{i}. Cuisine: {cuisine}, Meal: {meal}, Difficulty: {difficulty}")
 '''
 
+    # repr() keeps the generated file valid even if a value contains quotes
+    parts = [header]
+    parts.extend(
+        f'    ({tuple_item.cuisine_type!r}, {tuple_item.meal_type!r}, {tuple_item.degree_of_simplicity!r}),\n'
+        for tuple_item in tuples_data.tuples
+    )
+    parts.append(footer)
+    python_code = "".join(parts)
+
     with open(filename, 'w') as f:
         f.write(python_code)
     
     print(f"Tuples saved to {filename}")
 
-def save_queries_to_csv(queries_data: SyntheticQueriesList, filename: str = "synthetic_queries.csv"):
+def save_queries_to_csv(queries_data: List[Dict[str, str]], filename: str = "synthetic_queries.csv"):
     """save queries to CSV file"""
 
     with open(filename, 'w', newline='', encoding='utf-8') as file:
@@ -183,20 +458,20 @@ def save_queries_to_csv(queries_data: SyntheticQueriesList, filename: str = "syn
         # Write header
         writer.writerow(['id', 'query'])
         
-        # Write queries
-        for i, query_item in enumerate(queries_data.queries, 1):
-            writer.writerow([i, query_item.query])
+        # Write all queries in one call
+        writer.writerows((i, query_item["query"]) for i, query_item in enumerate(queries_data, 1))
     
     print(f"Queries saved to {filename}")
 
-def main():
+async def main(use_sync: bool = False):
     print("Starting automated queries generation")
     print(f"Using LLM model: {MODEL_NAME}")
+    print(f"Query generation mode: {'sync' if use_sync else 'batch'}")
 
     try:
-        # load prompts from YAML file
-        print("loading prompts from YAML...")
-        prompt_data = load_prompts('homeworks/hw2/prompts.yaml')
+        # load prompts from TOML file
+        print("loading prompts from TOML...")
+        prompt_data = load_prompts('homeworks/hw2/prompts.toml')
 
         # get the prompts we need
         tuple_prompt = get_prompt_by_subject(prompt_data, 'tuple prompt')
@@ -204,36 +479,48 @@ def main():
 
         print("Found required prompts")
 
+        #  start generating recipe dimension tuples, and prepare the output while waiting
+        print("generating recipe dimension tuples...")
+        tuple_task = asyncio.create_task(generate_recipe_tuples(tuple_prompt))
+
         # Create timestamp for filenames
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-        # Create output folder
+        # Create output folder; awaiting here hands control to the loop so the tuple request starts now
         output_folder = "generated_queries"
-        os.makedirs(output_folder, exist_ok=True)
+        await asyncio.to_thread(os.makedirs, output_folder, exist_ok=True)
 
         print(f"Output folder: {output_folder}")
         print(f"Timestamp: {timestamp}")
 
-        #  generate recipe dimension tuples
-        print("generating recipe dimension tuples...")
-        tuple_data = generate_recipe_tuples(tuple_prompt)
+        tuple_data = await tuple_task
+
+        # generate synthetic queries, saving the tuples to the file in the meantime
+        print("generating synthetic queries...")
+        if use_sync:
+            queries_task = asyncio.create_task(generate_synthetic_queries(query_prompt, tuple_data))
+        else:
+            batch_filename = f"{output_folder}/batch_requests_{timestamp}.jsonl"
+            queries_task = asyncio.create_task(
+                asyncio.to_thread(generate_synthetic_queries_batch, query_prompt, tuple_data, batch_filename)
+            )
 
-        # save tuples to the file
         tuples_filename = f"{output_folder}/recipe_dimensions_{timestamp}.py"
-        save_tuples_to_file(tuple_data, filename=tuples_filename)
+        await asyncio.to_thread(save_tuples_to_file, tuple_data, tuples_filename)
 
-        # generate synthetic queries
-        print("generating synthetic queries...")
-        queries_data = generate_synthetic_queries(query_prompt, tuple_data)
+        queries_data = await queries_task
 
         # save to csv file
         queries_filename = f"{output_folder}/synthetic_queries_{timestamp}.csv"
         save_queries_to_csv(queries_data, filename=queries_filename)
 
         print("Process completed successfully!")
-        print(f"generated {len(tuple_data.tuples)} tuples and {len(queries_data.queries)} queries")
+        print(f"generated {len(tuple_data.tuples)} tuples and {len(queries_data)} queries")
     except Exception as e:
         print(f"Error in main process {e}")
 
 if __name__=="__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate synthetic recipe queries")
+    parser.add_argument("--sync", action="store_true", help="call the LLM directly instead of submitting an OpenAI batch job")
+    args = parser.parse_args()
+    asyncio.run(main(use_sync=args.sync))
\ No newline at end of file